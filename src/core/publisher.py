@@ -4,9 +4,12 @@ MarkPigeon GitHub Publisher Module
 Handles uploading HTML files and assets to GitHub with GitHub Pages support.
 """
 
+import base64
 import logging
+import threading
 import time
-from collections.abc import Callable
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass, field
 from pathlib import Path
 
@@ -18,6 +21,33 @@ logger = logging.getLogger(__name__)
 # MarkPigeon repository for starring
 MARKPIGEON_REPO = "steven-jianhao-li/MarkPigeon"
 
+# Maximum number of blobs uploaded concurrently during a batch publish
+MAX_UPLOAD_WORKERS = 8
+
+# Files with these extensions are always uploaded as base64 blobs
+BINARY_EXTENSIONS = {
+    ".png",
+    ".jpg",
+    ".jpeg",
+    ".gif",
+    ".webp",
+    ".ico",
+    ".bmp",
+    ".svg",
+    ".pdf",
+    ".zip",
+}
+
+# Bytes read per base64 chunk; a multiple of 3 so chunks concatenate without padding
+B64_CHUNK_SIZE = 48 * 1024
+
+
+def _b64_chunks(path: Path, chunk_size: int = B64_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield the base64 encoding of a file one chunk at a time."""
+    with path.open("rb") as f:
+        while buf := f.read(chunk_size):
+            yield base64.b64encode(buf)
+
 
 @dataclass
 class PublishResult:
@@ -28,6 +58,7 @@ class PublishResult:
     message: str = ""
     files_uploaded: list[str] = field(default_factory=list)
     errors: list[str] = field(default_factory=list)
+    commit_sha: str = ""
 
 
 class PublishError(Exception):
@@ -77,13 +108,22 @@ class GitHubPublisher:
         """
         Validate token and get user info.
 
+        A successful result is cached on the instance, so repeated calls
+        do not hit the API again.
+
         Returns:
             Tuple of (success, username or error message)
         """
+        if self._github and self._user:
+            return True, self._user.login
+
         try:
-            self._github = Github(self.token)
-            self._user = self._github.get_user()
-            username = self._user.login
+            github = Github(self.token)
+            user = github.get_user()
+            # get_user() is lazy; only cache the client once login succeeds
+            username = user.login
+            self._github = github
+            self._user = user
             logger.info(f"Successfully authenticated as: {username}")
             return True, username
         except GithubException as e:
@@ -99,6 +139,8 @@ class GitHubPublisher:
         """
         Get existing repo or create a new one.
 
+        The repository is cached on the instance after the first lookup.
+
         Returns:
             Repository object
 
@@ -108,12 +150,16 @@ class GitHubPublisher:
         if not self._github or not self._user:
             raise PublishError("Not authenticated. Call check_connection first.")
 
+        if self._repo is not None:
+            return self._repo
+
         try:
             # Try to get existing repo
             repo = self._user.get_repo(self.repo_name)
             logger.info(f"Found existing repo: {repo.full_name}")
             # Ensure notifications are ignored
             self._ignore_notifications(repo)
+            self._repo = repo
             return repo
         except GithubException as e:
             if e.status != 404:
@@ -138,6 +184,7 @@ class GitHubPublisher:
             # Automatically ignore notifications for this repo
             self._ignore_notifications(repo)
 
+            self._repo = repo
             return repo
         except GithubException as e:
             raise PublishError(f"Failed to create repo: {e.data.get('message', str(e))}")
@@ -260,6 +307,8 @@ class GitHubPublisher:
         """
         Publish HTML file and assets to GitHub.
 
+        All files are uploaded as blobs and recorded in a single commit.
+
         Args:
             html_path: Path to HTML file
             assets_dir: Optional path to assets directory
@@ -267,71 +316,7 @@ class GitHubPublisher:
         Returns:
             PublishResult with URL and status
         """
-        result = PublishResult()
-
-        # Step 1: Validate connection
-        self._report_progress(0, 100, "Connecting to GitHub...")
-        success, msg = self.check_connection()
-        if not success:
-            result.message = msg
-            result.errors.append(msg)
-            return result
-
-        username = msg
-
-        # Step 2: Get or create repo
-        self._report_progress(10, 100, "Preparing repository...")
-        try:
-            self._repo = self.get_or_create_repo()
-        except PublishError as e:
-            result.message = str(e)
-            result.errors.append(str(e))
-            return result
-
-        # Step 3: Enable Pages
-        self._report_progress(20, 100, "Configuring GitHub Pages...")
-        self.enable_pages(self._repo)
-
-        # Step 4: Collect files to upload
-        files_to_upload: list[tuple[Path, str]] = []
-
-        # Add HTML file
-        html_name = html_path.name
-        files_to_upload.append((html_path, html_name))
-
-        # Add assets
-        if assets_dir and assets_dir.exists():
-            assets_dir_name = assets_dir.name
-            for asset_file in assets_dir.iterdir():
-                if asset_file.is_file():
-                    repo_path = f"{assets_dir_name}/{asset_file.name}"
-                    files_to_upload.append((asset_file, repo_path))
-
-        # Step 5: Upload files
-        total_files = len(files_to_upload)
-        for i, (file_path, repo_path) in enumerate(files_to_upload):
-            progress = 30 + int((i / total_files) * 60)
-            self._report_progress(progress, 100, f"Uploading {file_path.name}...")
-
-            if self.upload_file(self._repo, file_path, repo_path):
-                result.files_uploaded.append(repo_path)
-            else:
-                result.errors.append(f"Failed to upload: {repo_path}")
-
-        # Step 6: Build result
-        self._report_progress(95, 100, "Finalizing...")
-
-        if result.files_uploaded:
-            result.success = True
-            result.url = f"https://{username}.github.io/{self.repo_name}/{html_name}"
-            result.message = (
-                f"Published successfully! {len(result.files_uploaded)} file(s) uploaded."
-            )
-        else:
-            result.message = "No files were uploaded."
-
-        self._report_progress(100, 100, "Done!")
-        return result
+        return self.publish_batch([(html_path, assets_dir)])
 
     def get_pages_url(self) -> str:
         """
@@ -446,6 +431,74 @@ class GitHubPublisher:
             logger.error(error_msg)
             return False, error_msg
 
+    def _create_blob(self, repo: Repository, file_path: Path) -> str:
+        """
+        Create a git blob for a local file.
+
+        Binary files are sent base64-encoded, text files as UTF-8. Base64
+        content is encoded from the file in chunks of B64_CHUNK_SIZE bytes.
+
+        Args:
+            repo: Repository object
+            file_path: Local file path
+
+        Returns:
+            SHA of the created blob
+        """
+        if file_path.suffix.lower() not in BINARY_EXTENSIONS:
+            try:
+                text_content = file_path.read_bytes().decode("utf-8")
+            except UnicodeDecodeError:
+                # Fallback to base64 if not valid UTF-8
+                pass
+            else:
+                return repo.create_git_blob(text_content, "utf-8").sha
+
+        # Encode in chunks so the raw bytes are never held alongside the encoding
+        encoded_content = bytearray()
+        for chunk in _b64_chunks(file_path):
+            encoded_content += chunk
+        blob = repo.create_git_blob(encoded_content.decode("ascii"), "base64")
+        return blob.sha
+
+    def _create_blobs(self, repo: Repository, file_paths: list[Path]) -> list[str]:
+        """
+        Create git blobs for several files concurrently.
+
+        PyGithub clients keep a single persistent connection and are not safe
+        to share between threads, so every worker uploads through a client of
+        its own. Progress is reported from the calling thread only, since
+        callbacks may touch the GUI.
+
+        Args:
+            repo: Repository object
+            file_paths: Local file paths
+
+        Returns:
+            Blob SHAs in the same order as file_paths
+        """
+        local = threading.local()
+
+        def create_blob(file_path: Path) -> str:
+            if not hasattr(local, "repo"):
+                local.repo = Github(self.token).get_repo(repo.full_name, lazy=True)
+            return self._create_blob(local.repo, file_path)
+
+        total_files = len(file_paths)
+        blob_shas: list[str] = [""] * total_files
+
+        with ThreadPoolExecutor(max_workers=MAX_UPLOAD_WORKERS) as executor:
+            futures = {
+                executor.submit(create_blob, file_path): i for i, file_path in enumerate(file_paths)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                i = futures[future]
+                blob_shas[i] = future.result()
+                progress = 30 + int((done / total_files) * 50)
+                self._report_progress(progress, 100, f"Uploaded {file_paths[i].name}")
+
+        return blob_shas
+
     def publish_batch(
         self,
         files_to_publish: list[tuple[Path, Path | None]],
@@ -515,56 +568,16 @@ class GitHubPublisher:
             ref = repo.get_git_ref("heads/main")
             base_tree = repo.get_git_tree(ref.object.sha)
 
-            tree_elements = []
-            total_files = len(all_files)
-
-            for i, (file_path, repo_path) in enumerate(all_files):
-                progress = 30 + int((i / total_files) * 50)
-                self._report_progress(progress, 100, f"Processing {file_path.name}...")
-
-                content = file_path.read_bytes()
-
-                # Determine if file is binary (images, etc.) or text
-                # Use base64 for binary files, utf-8 for text files
-                binary_extensions = {
-                    ".png",
-                    ".jpg",
-                    ".jpeg",
-                    ".gif",
-                    ".webp",
-                    ".ico",
-                    ".bmp",
-                    ".svg",
-                    ".pdf",
-                    ".zip",
-                }
-                file_ext = file_path.suffix.lower()
-
-                if file_ext in binary_extensions:
-                    # Binary file - use base64 encoding
-                    import base64
-
-                    encoded_content = base64.b64encode(content).decode("ascii")
-                    blob = repo.create_git_blob(encoded_content, "base64")
-                else:
-                    # Text file - use utf-8 encoding
-                    try:
-                        text_content = content.decode("utf-8")
-                    except UnicodeDecodeError:
-                        # Fallback to base64 if not valid UTF-8
-                        import base64
-
-                        encoded_content = base64.b64encode(content).decode("ascii")
-                        blob = repo.create_git_blob(encoded_content, "base64")
-                    else:
-                        blob = repo.create_git_blob(text_content, "utf-8")
+            blob_shas = self._create_blobs(repo, [file_path for file_path, _ in all_files])
 
+            tree_elements = []
+            for (_, repo_path), sha in zip(all_files, blob_shas):
                 tree_elements.append(
                     InputGitTreeElement(
                         path=repo_path,
                         mode="100644",
                         type="blob",
-                        sha=blob.sha,
+                        sha=sha,
                     )
                 )
                 result.files_uploaded.append(repo_path)
@@ -585,6 +598,7 @@ class GitHubPublisher:
 
             # Build result
             result.success = True
+            result.commit_sha = new_commit.sha
 
             # Build URLs for HTML files only
             html_files = [f for f in files_to_publish]
@@ -0,0 +1,49 @@
+"""
+Shared pytest fixtures for the MarkPigeon test suite.
+"""
+
+import pytest
+
+from src.core.publisher import GitHubPublisher
+from tests.helpers import get_test_token
+
+
+def pytest_addoption(parser):
+    """Register the opt-in flag for tests that hit the real GitHub API."""
+    parser.addoption(
+        "--run-integration",
+        action="store_true",
+        default=False,
+        help="run tests marked as integration (requires GITHUB_TOKEN)",
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip integration tests unless --run-integration is given."""
+    if config.getoption("--run-integration"):
+        return
+
+    skip_integration = pytest.mark.skip(reason="needs --run-integration")
+    for item in items:
+        if "integration" in item.keywords:
+            item.add_marker(skip_integration)
+
+
+@pytest.fixture(scope="session")
+def publisher():
+    """Authenticated publisher shared by all tests that use the real GitHub API."""
+    token = get_test_token()
+    if token is None:
+        pytest.skip("GITHUB_TOKEN not set in .env file")
+
+    publisher = GitHubPublisher(token, "markpigeon-test-shelf")
+    publisher.check_connection()
+    return publisher
+
+
+@pytest.fixture(scope="class")
+def connected_publisher(publisher):
+    """Shared publisher together with the username it authenticated as."""
+    success, username = publisher.check_connection()
+    assert success, username
+    return publisher, username
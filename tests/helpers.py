@@ -0,0 +1,21 @@
+"""
+Shared helpers for the MarkPigeon test suite.
+
+Uses .env file for GitHub token configuration.
+Copy .env.example to .env and add your token.
+"""
+
+import functools
+import os
+
+from dotenv import load_dotenv
+
+
+@functools.cache
+def get_test_token():
+    """Get GitHub token from the environment, loading .env on first use."""
+    load_dotenv()
+    token = os.getenv("GITHUB_TOKEN")
+    if not token or token == "your_github_token_here":
+        return None
+    return token
@@ -1,40 +1,132 @@
 """
 Tests for the MarkPigeon Publisher Module.
 
-Uses .env file for GitHub token configuration.
-Copy .env.example to .env and add your token.
+Integration tests use .env file for GitHub token configuration.
+Copy .env.example to .env, add your token and run with --run-integration.
 """
 
-import os
-import tempfile
-from pathlib import Path
-from unittest.mock import MagicMock, patch
+import base64
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from unittest.mock import patch
 
 import pytest
-from dotenv import load_dotenv
-
-# Load environment variables from .env file
-load_dotenv()
+from github import Auth, Github, GithubException
+from github.Requester import HTTPSRequestsConnectionClass, Requester
 
 # Import publisher module
-from src.core.publisher import GitHubPublisher, PublishError, PublishResult
-
-
-def get_test_token():
-    """Get GitHub token from environment."""
-    token = os.getenv("GITHUB_TOKEN")
-    if not token or token == "your_github_token_here":
-        return None
-    return token
+from src.core.publisher import GitHubPublisher, PublishError, PublishResult, _b64_chunks
+from tests.helpers import get_test_token  # noqa: F401 - used by requires_token
 
-
-# Mark tests that require a real token
+# Mark tests that require a real token. The string condition is evaluated
+# at setup time, so collection never reads .env.
 requires_token = pytest.mark.skipif(
-    get_test_token() is None,
+    "get_test_token() is None",
     reason="GITHUB_TOKEN not set in .env file",
 )
 
 
+# Lightweight stand-ins for the PyGithub objects the publisher touches.
+# Unlike MagicMock they only expose the attributes the code is expected to use.
+
+
+@dataclass(slots=True)
+class _FakeGitObject:
+    sha: str
+
+
+@dataclass(slots=True)
+class _FakeRef:
+    object: _FakeGitObject = field(default_factory=lambda: _FakeGitObject("head-sha"))
+    edited_to: str = ""
+
+    def edit(self, sha):
+        self.edited_to = sha
+
+
+@dataclass(slots=True)
+class _FakeRepo:
+    full_name: str = "testuser/repo"
+    ref: _FakeRef = field(default_factory=_FakeRef)
+    blobs: list = field(default_factory=list)
+    trees: list = field(default_factory=list)
+    commits: list = field(default_factory=list)
+    in_flight: int = 0
+    peak_in_flight: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+    def create_git_blob(self, content, encoding):
+        with self.lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self.lock:
+            self.in_flight -= 1
+            self.blobs.append((content, encoding))
+        return _FakeGitObject(f"sha-{content}")
+
+    def get_git_ref(self, ref):
+        return self.ref
+
+    def get_git_tree(self, sha):
+        return _FakeGitObject(sha)
+
+    def create_git_tree(self, tree, base_tree):
+        self.trees.append(tree)
+        return _FakeGitObject("tree-sha")
+
+    def get_git_commit(self, sha):
+        return _FakeGitObject(sha)
+
+    def create_git_commit(self, message, tree, parents):
+        self.commits.append(message)
+        return _FakeGitObject("commit-sha")
+
+
+@dataclass(slots=True)
+class _FakeUser:
+    login: str = "testuser"
+    repo: _FakeRepo = field(default_factory=_FakeRepo)
+    repo_lookups: int = 0
+
+    def get_repo(self, name):
+        self.repo_lookups += 1
+        return self.repo
+
+
+@dataclass(slots=True)
+class _FakeGH:
+    user: _FakeUser = field(default_factory=_FakeUser)
+
+    def get_user(self):
+        return self.user
+
+    def get_repo(self, full_name, lazy=False):
+        return self.user.repo
+
+
+@dataclass(slots=True)
+class _FakeHTTPResponse:
+    status: int
+    body: str
+
+    def getheaders(self):
+        return {}.items()
+
+    def read(self):
+        return self.body
+
+
+def _slow_blob_response(connection):
+    """Answer a blob POST from the request stored on the connection, after a thread switch."""
+    time.sleep(0.001)
+    content = json.loads(connection.input)["content"]
+    return _FakeHTTPResponse(201, json.dumps({"sha": f"sha-{content}"}))
+
+
 class TestPublisherMocked:
     """Unit tests with mocked GitHub API."""
 
@@ -56,35 +148,136 @@ class TestPublisherMocked:
 
         assert publisher.progress_callback is callback
 
-    @patch("src.core.publisher.Github")
-    def test_check_connection_success(self, mock_github):
+    @patch.object(Requester, "requestJsonAndCheck", return_value=({}, {"login": "testuser"}))
+    def test_check_connection_success(self, mock_request):
         """Test successful token validation."""
-        # Setup mock
-        mock_user = MagicMock()
-        mock_user.login = "testuser"
-        mock_github.return_value.get_user.return_value = mock_user
-
         publisher = GitHubPublisher("valid_token")
         success, message = publisher.check_connection()
 
         assert success is True
         assert message == "testuser"
-
-    @patch("src.core.publisher.Github")
-    def test_check_connection_failure(self, mock_github):
+        assert mock_request.call_args.args[:2] == ("GET", "/user")
+
+    @patch.object(
+        Requester,
+        "requestJsonAndCheck",
+        side_effect=GithubException(401, {"message": "Bad credentials"}, {}),
+    )
+    def test_check_connection_failure(self, mock_request):
         """Test failed token validation."""
-        from github import GithubException
-
-        mock_github.return_value.get_user.side_effect = GithubException(
-            401, {"message": "Bad credentials"}, {}
-        )
-
         publisher = GitHubPublisher("invalid_token")
         success, message = publisher.check_connection()
 
         assert success is False
         assert "Bad credentials" in message
 
+    @patch.object(
+        Requester,
+        "requestJsonAndCheck",
+        side_effect=[
+            GithubException(401, {"message": "Bad credentials"}, {}),
+            GithubException(401, {"message": "Bad credentials"}, {}),
+            ({}, {"login": "testuser"}),
+        ],
+    )
+    def test_check_connection_retry_after_failure(self, mock_request):
+        """Test a failed validation is not cached and can be retried."""
+        publisher = GitHubPublisher("token")
+
+        for _ in range(2):
+            success, message = publisher.check_connection()
+            assert success is False
+            assert "Bad credentials" in message
+
+        assert publisher.check_connection() == (True, "testuser")
+        assert mock_request.call_count == 3
+
+    def test_connection_and_repo_are_cached(self):
+        """Test repeated calls reuse the authenticated client and repo."""
+        fake_github = _FakeGH()
+        publisher = GitHubPublisher("valid_token")
+
+        with patch("src.core.publisher.Github", return_value=fake_github) as mock_github:
+            assert publisher.check_connection() == (True, "testuser")
+            assert publisher.check_connection() == (True, "testuser")
+            assert publisher.get_or_create_repo() is publisher.get_or_create_repo()
+
+        mock_github.assert_called_once()
+        assert fake_github.user.repo_lookups == 1
+
+    def test_publish_batch_uploads_blobs_concurrently(self, tmp_path):
+        """Test batch publish creates blobs in workers and reports progress in order."""
+        progress_threads = []
+
+        def callback(curr, total, msg):
+            progress_threads.append(threading.get_ident())
+
+        html_file = tmp_path / "doc.html"
+        html_file.write_text("<html><body>Doc</body></html>", encoding="utf-8")
+        assets_dir = tmp_path / "assets_doc"
+        assets_dir.mkdir()
+        for i in range(10):
+            (assets_dir / f"image{i}.png").write_bytes(b"fake png data %d" % i)
+
+        repo = _FakeRepo()
+
+        publisher = GitHubPublisher("token", "repo", progress_callback=callback)
+        with (
+            patch("src.core.publisher.Github", return_value=_FakeGH(_FakeUser(repo=repo))),
+            patch.object(publisher, "check_connection", return_value=(True, "testuser")),
+            patch.object(publisher, "get_or_create_repo", return_value=repo),
+            patch.object(publisher, "enable_pages", return_value=True),
+        ):
+            result = publisher.publish_batch([(html_file, assets_dir)])
+
+        assert result.success is True
+        assert len(result.files_uploaded) == 11
+        assert len(repo.blobs) == 11
+        assert repo.peak_in_flight > 1
+        assert len(repo.commits) == 1
+        assert result.commit_sha == "commit-sha"
+        assert repo.ref.edited_to == "commit-sha"
+
+        # Tree elements keep the collection order regardless of completion order
+        tree_elements = repo.trees[0]
+        assert [e._identity["path"] for e in tree_elements] == result.files_uploaded
+
+        # Callbacks may touch the GUI, so they must stay on the calling thread
+        assert set(progress_threads) == {threading.get_ident()}
+
+    def test_create_blobs_uses_one_client_per_worker(self, tmp_path):
+        """Test concurrent blob uploads never read another request's response."""
+        file_paths = []
+        for i in range(16):
+            file_path = tmp_path / f"doc{i}.html"
+            file_path.write_text(f"<p>{i}</p>", encoding="utf-8")
+            file_paths.append(file_path)
+
+        repo = Github(auth=Auth.Token("token")).get_repo("testuser/repo", lazy=True)
+        publisher = GitHubPublisher("token", "repo")
+
+        # A shared connection would answer with whichever request was stored last.
+        # Write throttling is disabled so workers reusing a thread don't wait 1s.
+        with (
+            patch("src.core.publisher.Github", partial(Github, seconds_between_writes=None)),
+            patch.object(HTTPSRequestsConnectionClass, "getresponse", _slow_blob_response),
+        ):
+            blob_shas = publisher._create_blobs(repo, file_paths)
+
+        assert blob_shas == [f"sha-<p>{i}</p>" for i in range(16)]
+
+    def test_b64_chunks_matches_whole_file_encoding(self, tmp_path):
+        """Test chunked base64 encoding concatenates to the full encoding."""
+        data = bytes(range(256)) * 1000 + b"tail"
+        asset = tmp_path / "large.png"
+        asset.write_bytes(data)
+
+        chunks = list(_b64_chunks(asset, chunk_size=3 * 1024))
+
+        assert len(chunks) > 1
+        assert all(len(chunk) <= 4 * 1024 for chunk in chunks)
+        assert b"".join(chunks) == base64.b64encode(data)
+
     def test_publish_result_defaults(self):
         """Test PublishResult default values."""
         result = PublishResult()
@@ -96,30 +289,22 @@ class TestPublisherMocked:
         assert result.errors == []
 
 
+@pytest.mark.integration
+@pytest.mark.xdist_group("github-repo")
+@requires_token
 class TestPublisherWithToken:
     """Integration tests using real GitHub API."""
 
-    @requires_token
-    def test_check_connection_real(self):
+    def test_check_connection_real(self, connected_publisher):
         """Test real token validation."""
-        token = get_test_token()
-        publisher = GitHubPublisher(token)
+        _, username = connected_publisher
 
-        success, username = publisher.check_connection()
-
-        assert success is True
         assert len(username) > 0
         print(f"✅ Connected as: {username}")
 
-    @requires_token
-    def test_get_or_create_repo_real(self):
+    def test_get_or_create_repo_real(self, connected_publisher):
         """Test repository creation/access."""
-        token = get_test_token()
-        publisher = GitHubPublisher(token, "markpigeon-test-shelf")
-
-        # First connect
-        success, _ = publisher.check_connection()
-        assert success
+        publisher, _ = connected_publisher
 
         # Try to get or create repo
         try:
@@ -129,15 +314,9 @@ class TestPublisherWithToken:
         except PublishError as e:
             pytest.skip(f"Could not create test repo: {e}")
 
-    @requires_token
-    def test_upload_file_real(self):
+    def test_upload_file_real(self, tmp_path, connected_publisher):
         """Test real file upload."""
-        token = get_test_token()
-        publisher = GitHubPublisher(token, "markpigeon-test-shelf")
-
-        # Connect and get repo
-        success, _ = publisher.check_connection()
-        assert success
+        publisher, _ = connected_publisher
 
         try:
             repo = publisher.get_or_create_repo()
@@ -145,29 +324,18 @@ class TestPublisherWithToken:
             pytest.skip(f"Could not access repo: {e}")
 
         # Create a test file
-        with tempfile.NamedTemporaryFile(
-            mode="w", suffix=".html", delete=False
-        ) as f:
-            f.write("<html><body>Test from pytest</body></html>")
-            test_file = Path(f.name)
+        test_file = tmp_path / "pytest_test.html"
+        test_file.write_text("<html><body>Test from pytest</body></html>", encoding="utf-8")
 
-        try:
-            success = publisher.upload_file(
-                repo, test_file, "pytest_test.html", "Test upload from pytest"
-            )
-            assert success
-            print("✅ File uploaded successfully")
-        finally:
-            test_file.unlink()
-
-    @requires_token
-    def test_star_repo_real(self):
-        """Test starring the MarkPigeon repo."""
-        token = get_test_token()
-        publisher = GitHubPublisher(token)
-
-        success, _ = publisher.check_connection()
+        success = publisher.upload_file(
+            repo, test_file, "pytest_test.html", "Test upload from pytest"
+        )
         assert success
+        print("✅ File uploaded successfully")
+
+    def test_star_repo_real(self, connected_publisher):
+        """Test starring the MarkPigeon repo."""
+        publisher, _ = connected_publisher
 
         # Try to star
         success, message = publisher.star_repo()
@@ -175,48 +343,42 @@ class TestPublisherWithToken:
         # Should succeed or say already starred
         assert success or "already" in message.lower()
 
-    @requires_token
-    def test_full_publish_flow(self):
+    def test_full_publish_flow(self, tmp_path, connected_publisher, monkeypatch):
         """Test complete publish workflow."""
-        token = get_test_token()
-
+        publisher, _ = connected_publisher
         progress_log = []
 
         def progress_callback(curr, total, msg):
             progress_log.append((curr, total, msg))
 
-        publisher = GitHubPublisher(
-            token, "markpigeon-test-shelf", progress_callback=progress_callback
-        )
-
-        # Create test files
-        with tempfile.TemporaryDirectory() as tmpdir:
-            tmpdir = Path(tmpdir)
+        monkeypatch.setattr(publisher, "progress_callback", progress_callback)
 
-            # Create HTML file
-            html_file = tmpdir / "test_publish.html"
-            html_file.write_text(
-                "<html><body><img src='./assets_test/image.png'></body></html>",
-                encoding="utf-8",
-            )
+        # Create HTML file
+        html_file = tmp_path / "test_publish.html"
+        html_file.write_text(
+            "<html><body><img src='./assets_test/image.png'></body></html>",
+            encoding="utf-8",
+        )
 
-            # Create assets directory
-            assets_dir = tmpdir / "assets_test"
-            assets_dir.mkdir()
-            (assets_dir / "image.png").write_bytes(b"fake png data")
+        # Create assets directory
+        assets_dir = tmp_path / "assets_test"
+        assets_dir.mkdir()
+        (assets_dir / "image.png").write_bytes(b"fake png data")
 
-            # Publish
-            result = publisher.publish(html_file, assets_dir)
+        # Publish
+        result = publisher.publish(html_file, assets_dir)
 
-            print(f"Result: {result}")
-            print(f"Progress log: {progress_log}")
+        print(f"Result: {result}")
+        print(f"Progress log: {progress_log}")
 
-            if result.success:
-                assert result.url != ""
-                assert len(result.files_uploaded) > 0
-                print(f"✅ Published to: {result.url}")
-            else:
-                print(f"❌ Publish failed: {result.message}")
+        if result.success:
+            assert result.url != ""
+            assert len(result.files_uploaded) == 2
+            # All files land in one commit
+            assert result.commit_sha != ""
+            print(f"✅ Published to: {result.url}")
+        else:
+            print(f"❌ Publish failed: {result.message}")
 
 
 class TestConfigModule:
@@ -243,9 +405,13 @@ class TestConfigModule:
         assert config.github_token == "test_token"
         assert config.github_username == "testuser"
 
-    def test_config_save_load(self):
+    def test_config_save_load(self, tmp_path, monkeypatch):
         """Test config save and load."""
-        from src.core.config import AppConfig, get_config_file
+        from src.core.config import AppConfig
+
+        # Keep the user's real config untouched
+        config_file = tmp_path / "config.json"
+        monkeypatch.setattr("src.core.config.get_config_file", lambda: config_file)
 
         # Create a test config
         config = AppConfig(
@@ -256,6 +422,7 @@ class TestConfigModule:
 
         # Save it
         assert config.save()
+        assert config_file.exists()
 
         # Load it back
         loaded = AppConfig.load()